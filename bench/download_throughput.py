@@ -0,0 +1,187 @@
+"""
+Throughput harness for the download pipeline
+
+    ModPage -> ModLink.download -> decompress_into_dir -> Mod -> ModDB
+
+Every concurrency level runs in a fresh worker process with its own cache
+directory, against the local gamebanana stub, and reports mods/second and
+the peak RSS of the worker (and its 7z children).
+
+    python bench/download_throughput.py -n 50 -j 1 2 4 8 --latency 0.05
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+from argparse import SUPPRESS, ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from gbstub import DEFAULT_PAK, StubServer, StubSite  # noqa: E402
+
+
+def run_worker(base_url: str, count: int, concurrency: int) -> dict:
+    """
+    Push `count` mods through the download pipeline using `concurrency`
+    threads - ggmod must only be imported once the environment is set up
+    """
+    from ggmod import util
+    from ggmod.mods import ModDB, ModPage
+    from ggmod.settings import CACHE_DIR, DOWNLOAD_DIR, MODS_DIR
+
+    for directory in (CACHE_DIR, DOWNLOAD_DIR, MODS_DIR):
+        util.create_dir(directory)
+
+    mod_db = ModDB()
+    db_lock = threading.Lock()
+
+    def pipeline(mod_id: int):
+        modpage = ModPage(f"{base_url}/mods/{mod_id}")
+        mod = modpage[0].download()
+        mod.stage()
+
+        with db_lock:
+            mod_db.store_mod(mod)
+
+    failures = 0
+    first_error = None
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(pipeline, mod_id) for mod_id in range(1, count + 1)]
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                failures += 1
+                if first_error is None:
+                    frame = traceback.extract_tb(error.__traceback__)[-1]
+                    first_error = (
+                        f"{type(error).__name__}: {error} "
+                        f"({os.path.basename(frame.filename)}:{frame.lineno} in {frame.name})"
+                    )
+
+    elapsed = time.perf_counter() - start
+    stored = len(ModDB().get_mods())
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+    return {
+        "concurrency": concurrency,
+        "mods": count,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "mods_per_second": round((count - failures) / elapsed, 3),
+        "peak_rss_kb": peak_rss,
+        "first_error": first_error,
+        "stored": stored,
+    }
+
+
+def run_level(base_url: str, count: int, concurrency: int) -> dict:
+    """
+    Run a single concurrency level in a fresh process so peak RSS and the
+    on-disk cache are not shared between levels
+    """
+    with tempfile.TemporaryDirectory(prefix="ggmod-bench-") as cache_dir:
+        env = dict(os.environ, XDG_CACHE_HOME=cache_dir, GGMOD_GB_URL=base_url)
+        worker = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--worker",
+                "--base-url",
+                base_url,
+                "-n",
+                str(count),
+                "-j",
+                str(concurrency),
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+    if worker.returncode != 0:
+        e = f"Worker for concurrency {concurrency} crashed:\n{worker.stderr}"
+        raise RuntimeError(e)
+
+    return json.loads(worker.stdout.strip().splitlines()[-1])
+
+
+def parse_args():
+    parser = ArgumentParser(description="Measure download pipeline throughput")
+    parser.add_argument("-n", "--count", type=int, default=20, help="Mods per level")
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Concurrency levels to measure",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to each request"
+    )
+    parser.add_argument(
+        "--bandwidth", type=int, default=0, help="Bytes/second per response"
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="Fraction of requests to fail"
+    )
+    parser.add_argument("--pak", default=DEFAULT_PAK, help="Pak packed into archives")
+    parser.add_argument("--records", help="Directory of recorded <id>.json responses")
+    parser.add_argument("--worker", action="store_true", help=SUPPRESS)
+    parser.add_argument("--base-url", help=SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.worker:
+        result = run_worker(args.base_url, args.count, args.concurrency[0])
+        print(json.dumps(result))
+        return
+
+    server = StubServer(
+        StubSite(args.pak, args.records),
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        failure_rate=args.failure_rate,
+    )
+    server.start()
+
+    print(f"[*] Stub server at {server.base_url}")
+    print("concurrency\tmods/s\tfailures\tpeak RSS (KB)")
+
+    try:
+        for concurrency in args.concurrency:
+            result = run_level(server.base_url, args.count, concurrency)
+            print(
+                f"{result['concurrency']}\t\t{result['mods_per_second']}"
+                f"\t{result['failures']}\t\t{result['peak_rss_kb']}"
+            )
+            if result["first_error"] is not None:
+                print(f"[!] First failure: {result['first_error']}")
+
+            expected = result["mods"] - result["failures"]
+            if result["stored"] != expected:
+                print(f"[!] ModDB holds {result['stored']} mods, expected {expected}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Local stand-in for the bits of gamebanana that ggmod talks to
+
+Serves mod pages, apiv10 DownloadPage JSON and mod archives so the whole
+download path can be exercised offline. Point ggmod at it by setting
+GGMOD_GB_URL to the server's base URL before importing ggmod.
+"""
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import struct
+import threading
+import time
+import zipfile
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+DEFAULT_PAK = os.path.join(REPO_DIR, "tests", "GothColor03.pak")
+DEFAULT_SIG = os.path.join(REPO_DIR, "ggmod", "sigfile.sig")
+
+PAGE_RE = re.compile(r"^/mods/([0-9]+)$")
+INFO_RE = re.compile(r"^/apiv10/Mod/([0-9]+)/DownloadPage$")
+FILE_RE = re.compile(r"^/dl/([^/]+)$")
+RANGE_RE = re.compile(r"^bytes=([0-9]*)-([0-9]*)$")
+
+PAK_MAGIC = 0x5A6F12E1
+PAK_FOOTER_OFFSETS = (44, 172, 204, 205)
+
+PAGE_HTML = """<html><body>
+<h1 id="PageTitle">{title}<small>stub</small></h1>
+</body></html>
+"""
+
+
+def variant_pak(pak: bytes, seed: str) -> bytes:
+    """
+    Copy of a pak that differs from every other variant in the index hash
+    stored in its footer, which nothing reading the pak checks - so each
+    generated archive has its own pak hash but the same assets
+
+    :param pak: contents of the original pak file
+    :param seed: anything unique to the variant, e.g. the archive name
+    :returns: contents of the variant pak file
+    """
+    for footer_offset in PAK_FOOTER_OFFSETS:
+        if len(pak) >= footer_offset:
+            (magic,) = struct.unpack_from("<I", pak, len(pak) - footer_offset)
+            if magic == PAK_MAGIC:
+                break
+    else:
+        raise ValueError("Cannot make variant of pak without a footer")
+
+    hash_start = len(pak) - footer_offset + 24
+    index_hash = hashlib.sha1(seed.encode()).digest()
+    return pak[:hash_start] + index_hash + pak[hash_start + 20 :]
+
+
+class StubSite:
+    """
+    Content served by the stub server - recorded DownloadPage JSON where
+    available, otherwise generated pages and archives built from a pak file
+    """
+
+    def __init__(
+        self,
+        pakfile: str = DEFAULT_PAK,
+        records_dir: Optional[str] = None,
+    ):
+        """
+        :param pakfile: pak file packed into every generated archive
+        :param records_dir: directory of recorded <mod id>.json DownloadPage
+            responses and archives
+        """
+        self.pakfile = pakfile
+        self.records_dir = records_dir
+        self.base_url = ""
+        self._archives: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def page(self, mod_id: str) -> bytes:
+        return PAGE_HTML.format(title=f"Stub Mod {mod_id}").encode()
+
+    def info(self, mod_id: str) -> bytes:
+        """
+        DownloadPage JSON with every download URL pointing back at the stub
+        """
+        recorded = None
+        if self.records_dir is not None:
+            path = os.path.join(self.records_dir, f"{mod_id}.json")
+            if os.path.isfile(path):
+                with open(path) as fp:
+                    recorded = json.load(fp)
+
+        if recorded is None:
+            recorded = {
+                "_aFiles": [
+                    {
+                        "_sFile": f"stub_{mod_id}.zip",
+                        "_sDescription": f"Generated archive for mod {mod_id}",
+                        "_tsDateAdded": int(time.time()),
+                    }
+                ]
+            }
+
+        for info in recorded["_aFiles"]:
+            info["_sDownloadUrl"] = f"{self.base_url}/dl/{info['_sFile']}"
+
+        return json.dumps(recorded).encode()
+
+    def archive(self, filename: str) -> bytes:
+        """
+        Recorded archive of the same name if there is one, otherwise a zip
+        holding a variant of the stub pak unique to this archive, and a sig,
+        both renamed after the archive
+        """
+        with self._lock:
+            if filename in self._archives:
+                return self._archives[filename]
+
+            recorded = None
+            if self.records_dir is not None:
+                recorded = os.path.join(self.records_dir, filename)
+
+            if recorded is not None and os.path.isfile(recorded):
+                with open(recorded, "rb") as fp:
+                    self._archives[filename] = fp.read()
+            else:
+                stem = os.path.splitext(filename)[0]
+                buffer = io.BytesIO()
+
+                with open(self.pakfile, "rb") as fp:
+                    pak = variant_pak(fp.read(), filename)
+
+                with zipfile.ZipFile(buffer, "w") as zf:
+                    zf.writestr(f"{stem}.pak", pak)
+                    zf.write(DEFAULT_SIG, f"{stem}.sig")
+
+                self._archives[filename] = buffer.getvalue()
+
+            return self._archives[filename]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler with latency, bandwidth and failure injection taken
+    from the server it is attached to
+
+    Archives honour single-range Range headers unless the server has
+    ranges disabled, so partial reads can be tested both ways
+    """
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+
+        if server.failure_rate and random.random() < server.failure_rate:
+            return self._send(503, b"injected failure", "text/plain")
+
+        if match := PAGE_RE.match(self.path):
+            self._send(200, server.site.page(match[1]), "text/html")
+        elif match := INFO_RE.match(self.path):
+            self._send(200, server.site.info(match[1]), "application/json")
+        elif match := FILE_RE.match(self.path):
+            self._send_archive(server.site.archive(match[1]))
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _send_archive(self, body: bytes):
+        byte_range = self.headers.get("Range")
+        match = RANGE_RE.match(byte_range) if byte_range else None
+
+        if not self.server.ranges or match is None or match.groups() == ("", ""):
+            return self._send(200, body, "application/zip")
+
+        start, end = match.groups()
+        if start == "":
+            start, end = max(0, len(body) - int(end)), len(body) - 1
+        else:
+            start = int(start)
+            end = min(int(end), len(body) - 1) if end else len(body) - 1
+
+        if start >= len(body) or start > end:
+            headers = {"Content-Range": f"bytes */{len(body)}"}
+            return self._send(416, b"", "application/zip", headers)
+
+        headers = {"Content-Range": f"bytes {start}-{end}/{len(body)}"}
+        self._send(206, body[start : end + 1], "application/zip", headers)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Accept-Ranges", "bytes" if self.server.ranges else "none")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self._write_throttled(body)
+
+    def _write_throttled(self, body: bytes):
+        bandwidth = self.server.bandwidth
+        chunk_size = max(1, bandwidth // 20) if bandwidth else len(body) or 1
+
+        try:
+            for start in range(0, len(body), chunk_size):
+                chunk = body[start : start + chunk_size]
+                self.wfile.write(chunk)
+                if bandwidth:
+                    time.sleep(len(chunk) / bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            # capped partial reads hang up before the body is finished
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        site: StubSite,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+        failure_rate: float = 0.0,
+        ranges: bool = True,
+    ):
+        """
+        :param site: content to serve
+        :param port: port to listen on, 0 picks a free one
+        :param latency: seconds to wait before answering each request
+        :param bandwidth: bytes per second per response, 0 for unlimited
+        :param failure_rate: fraction of requests answered with a 503
+        :param ranges: honour Range headers on archive downloads
+        """
+        super().__init__((host, port), StubHandler)
+        self.site = site
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.failure_rate = failure_rate
+        self.ranges = ranges
+        site.base_url = self.base_url
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        """
+        Serve in a background thread
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
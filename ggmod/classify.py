@@ -0,0 +1,190 @@
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ggmod.const import CHAR_IDS
+
+CHARACTER_TYPES = ("mesh", "colour", "character")
+
+CONTENT_PREFIXES = {
+    "/chara/": "character",
+    "/ui/": "ui",
+    "/bg/": "stage",
+    "/stage/": "stage",
+    "/voice/": "voice",
+    "/vo_": "voice",
+    "/bgm/": "music",
+    "/music/": "music",
+}
+
+
+class PatternAutomaton:
+    """
+    Aho-Corasick automaton matching many lowercase patterns in a single pass
+    over the text, whatever the number of patterns
+    """
+
+    def __init__(self, patterns: Dict[str, Tuple]):
+        """
+        :param patterns: pattern string mapped to the label reported on a match
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple]] = [[]]
+
+        for pattern, label in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state].append(label)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def matches(self, text: str) -> Iterable[Tuple[int, Tuple]]:
+        """
+        :param text: lowercase text to search
+        :returns: (index just past the match, label) for every match in text
+        """
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for label in self._out[state]:
+                yield i + 1, label
+
+
+def _build_automaton() -> PatternAutomaton:
+    patterns = {prefix: ("type", mod_type) for prefix, mod_type in CONTENT_PREFIXES.items()}
+
+    for code in CHAR_IDS:
+        patterns[f"/{code.lower()}/"] = ("char", code)
+        patterns[f"/{code.lower()}_"] = ("char", code)
+
+    patterns["mesh"] = ("mesh",)
+    patterns["/costume"] = ("costume",)
+    patterns["/color"] = ("slot",)
+    return PatternAutomaton(patterns)
+
+
+AUTOMATON = _build_automaton()
+
+
+class ModClassification:
+    """
+    Mod type, character, costume and slot candidates guessed from the asset
+    paths of a pak file, ranked by the number of assets supporting them
+    """
+
+    def __init__(self):
+        self.types = Counter()
+        self.char_ids = Counter()
+        self.costumes = Counter()
+        self.slots = Counter()
+        self.mesh = False
+
+    @property
+    def char_id(self) -> Optional[str]:
+        return _most_common(self.char_ids)
+
+    @property
+    def costume(self) -> Optional[str]:
+        return _most_common(self.costumes)
+
+    @property
+    def slot(self) -> Optional[str]:
+        return _most_common(self.slots)
+
+    @property
+    def mod_type(self) -> str:
+        """
+        One of "mesh", "colour", "character", "ui", "stage", "voice", "music"
+        or "unknown" - content type prefixes are weighed first, and char_id is
+        kept separately for per-character UI or voice mods
+        """
+        other_types = Counter({t: n for t, n in self.types.items() if t != "character"})
+        other_type = _most_common(other_types)
+
+        # e.g. UI/Chara/SOL or Sound/Voice/SOL - a character ID alone doesn't
+        # make it a character mod
+        if other_type is not None and other_types[other_type] >= self.types["character"]:
+            return other_type
+
+        if self.char_ids or self.types["character"]:
+            if self.mesh:
+                return "mesh"
+            elif self.slots:
+                return "colour"
+            else:
+                return "character"
+
+        return "unknown"
+
+    def __repr__(self) -> str:
+        return (
+            f"ModClassification({self.mod_type!r}, char_id={self.char_id!r}, "
+            f"costume={self.costume!r}, slot={self.slot!r})"
+        )
+
+
+def classify_paths(asset_paths: Iterable[str], mount_point: str = "") -> ModClassification:
+    """
+    Classify a mod from its pak listing alone, without decompressing any
+    assets - every path is scanned once by the same automaton
+
+    :param asset_paths: asset paths from the pak listing
+    :param mount_point: pak mount point, which applies to every asset path
+    :returns: classification of the mod
+    """
+    asset_paths = list(asset_paths)
+    result = ModClassification()
+
+    _scan(f"/{mount_point.strip(chr(0))}".lower(), result, max(1, len(asset_paths)))
+    for path in asset_paths:
+        _scan(f"/{path}".lower(), result, 1)
+
+    return result
+
+
+def _scan(text: str, result: ModClassification, weight: int) -> None:
+    for end, label in AUTOMATON.matches(text):
+        kind = label[0]
+
+        if kind == "type":
+            result.types[label[1]] += weight
+        elif kind == "char":
+            result.char_ids[label[1]] += weight
+        elif kind == "mesh":
+            result.mesh = True
+        else:
+            digits = _read_digits(text, end)
+            if digits and kind == "costume":
+                result.costumes[digits] += weight
+            elif digits:
+                result.slots[digits] += weight
+
+
+def _read_digits(text: str, start: int) -> str:
+    end = start
+    while end < len(text) and text[end].isdigit():
+        end += 1
+    return text[start:end]
+
+
+def _most_common(counter: Counter) -> Optional[str]:
+    if not counter:
+        return None
+    return counter.most_common(1)[0][0]
@@ -1,5 +1,8 @@
+import os
+
 MODPAGE_URL_RE = "http[s]{0,1}://gamebanana\.com/mods/[0-9]+"
-GB_INFO_URL = "https://gamebanana.com/apiv10/Mod/{}/DownloadPage"
+GB_URL = os.getenv("GGMOD_GB_URL", "https://gamebanana.com").rstrip("/")
+GB_INFO_URL = GB_URL + "/apiv10/Mod/{}/DownloadPage"
 
 CHAR_IDS = {
     "ASK": "Asuka R#",
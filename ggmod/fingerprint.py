@@ -0,0 +1,91 @@
+import hashlib
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+FINGERPRINT_SIZE = 16
+CHUNK_SIZE = 1 << 20
+MAX_OWNERS = 50
+
+
+def fingerprint_file(path: str) -> str:
+    """
+    Content fingerprint of a whole file, read in chunks so large paks are
+    never held in memory at once
+
+    :param path: full path of the file to hash
+    :returns: hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def find_identical(records: Iterable) -> List[List]:
+    """
+    Group mods whose pak files are byte-for-byte identical
+
+    :param records: mods or mod records with a pak_hash attribute
+    :returns: groups of two or more mods sharing a pak hash
+    """
+    groups = defaultdict(list)
+
+    for record in records:
+        if record.pak_hash:
+            groups[record.pak_hash].append(record)
+
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_similar(
+    fingerprints: Dict[str, Iterable[str]],
+    threshold: float = 0.5,
+    max_owners: int = MAX_OWNERS,
+) -> List[Tuple[str, str, float]]:
+    """
+    Find pairs of paks sharing most of their assets, e.g. recolours or
+    re-uploads of the same base mod
+
+    An inverted index from asset fingerprint to the paks containing it is
+    built first, so only paks that actually share an asset are compared.
+    Counting shared assets costs the square of the number of paks holding
+    each asset, so assets found in more than max_owners paks (e.g. a base
+    mesh left untouched by every recolour) are treated as common and not
+    counted as shared. That keeps the work linear in the total number of
+    assets, at the cost of underestimating similarity through such assets.
+
+    :param fingerprints: asset fingerprints of each pak, keyed by pak hash
+    :param threshold: minimum fraction of shared assets (Jaccard similarity)
+    :param max_owners: skip assets shared by more than this many paks
+    :returns: (pak hash, pak hash, similarity) tuples, most similar first
+    """
+    asset_sets = {key: set(assets) for key, assets in fingerprints.items() if assets}
+    index: Dict[str, List[str]] = defaultdict(list)
+
+    for key, assets in asset_sets.items():
+        for fingerprint in assets:
+            index[fingerprint].append(key)
+
+    shared: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    for owners in index.values():
+        if len(owners) > max_owners:
+            continue
+        for n, first in enumerate(owners):
+            for second in owners[n + 1 :]:
+                shared[(first, second)] += 1
+
+    pairs = []
+
+    for (first, second), count in shared.items():
+        union = len(asset_sets[first]) + len(asset_sets[second]) - count
+        similarity = count / union
+
+        if similarity >= threshold:
+            pairs.append((first, second, similarity))
+
+    return sorted(pairs, key=lambda pair: pair[2], reverse=True)
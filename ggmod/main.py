@@ -3,31 +3,68 @@ from argparse import ArgumentParser
 from ggmod import util
 from ggmod.settings import MODS_DIR, DOWNLOAD_DIR, GAME_MOD_DIR, CONF_DIR
 from ggmod.mods import ModPage, ModDB
+from ggmod.fingerprint import find_identical, find_similar
 from ggmod.errors import SlotNotFoundError, CharNotFoundError
+from ggmod.preview import guess_char_slot
+
+import requests
 
 import shutil
+import struct
 import os
 
 import string
 
 
+def print_preview(modlink):
+    """
+    Print the paks inside an archive without downloading it
+
+    :returns: False if the archive is known to contain no paks
+    """
+    try:
+        preview = modlink.preview()
+    except (requests.RequestException, ValueError, struct.error):
+        print("      (could not preview archive)")
+        return True
+
+    for name, size in preview.paks:
+        char_id, slot = guess_char_slot(name)
+        size_str = f"{size / 2**20:.1f} MB" if size is not None else "? MB"
+        guess = " ".join(filter(None, [char_id, f"slot {slot}" if slot else None]))
+        print(f"      {name} ({size_str}) {guess}".rstrip())
+
+    if not preview.has_paks:
+        print("      (no paks in archive - skipping)")
+
+    return preview.has_paks
+
+
 def download(args):
     print(f"[*] Processing {len(args.link)} mods from GB...")
     modpage = ModPage(args.link)
 
     if len(modpage) > 1:
+        choices = []
         for i, modlink in enumerate(modpage):
             print(f"[{i+1}] {modlink.name} - {modlink.description}")
+            if print_preview(modlink):
+                choices.append(i)
 
         choice = input("[?] Choice: ")
-        if not all(char in string.digits for char in choice):
+        if not choice or not all(char in string.digits for char in choice):
+            choice = None
+        elif int(choice) - 1 not in choices:
             choice = None
         else:
             choice = int(choice) - 1
     elif len(modpage) == 1:
         modlink = modpage[0]
         print(f"[*] Selected mod: {modlink.name} - {modlink.description}")
-        choice = 0 if util.input_yn("[?] Stage this archive (Y/n) ") else None
+        if not print_preview(modlink):
+            choice = None
+        else:
+            choice = 0 if util.input_yn("[?] Stage this archive (Y/n) ") else None
 
     if choice or choice is not None:
         modlink = modpage[choice]
@@ -39,10 +76,19 @@ def download(args):
             modlink.set_mesh(True)
 
         chosen_mod = modlink.download()
-        chosen_mod.stage()
-
         mod_db = ModDB()
 
+        # the user has already been asked about duplicates, so store regardless
+        force_store = False
+        duplicate = mod_db.find_duplicate(chosen_mod)
+        if duplicate is not None:
+            print(f"[!] Identical to already stored mod: {duplicate.name}")
+            if not util.input_yn("[?] Stage anyway (y/N) "):
+                exit(0)
+            force_store = True
+
+        chosen_mod.stage()
+
         try:
             chosen_mod.determine_props()
         except SlotNotFoundError:
@@ -57,7 +103,11 @@ def download(args):
             else:
                 raise e
 
-        mod_db.store_mod(chosen_mod)
+        print(
+            f"[*] Detected {chosen_mod.mod_type} mod "
+            f"(char: {chosen_mod.char_id}, slot: {chosen_mod.slot})"
+        )
+        mod_db.store_mod(chosen_mod, force=force_store)
 
         print("[!] Done")
     else:
@@ -65,6 +115,35 @@ def download(args):
         exit(0)
 
 
+def dupes(args):
+    mod_db = ModDB()
+    records = mod_db.get_mods()
+    fingerprints = mod_db.get_fingerprints()
+
+    names = {}
+    for record in records:
+        names.setdefault(record.pak_hash, []).append(record.name)
+
+    unhashed = [record for record in records if record.pak_hash not in fingerprints]
+    if unhashed:
+        print(f"[!] Skipping {len(unhashed)} mods stored without fingerprints")
+
+    for group in find_identical(records):
+        print(f"[*] Identical paks: {', '.join(record.name for record in group)}")
+
+    stored_fingerprints = {
+        pak_hash: fingerprints[pak_hash].values()
+        for pak_hash in names
+        if pak_hash in fingerprints
+    }
+
+    for first, second, similarity in find_similar(stored_fingerprints, args.threshold):
+        print(
+            f"[*] {similarity:.0%} shared assets: "
+            f"{', '.join(names[first])} / {', '.join(names[second])}"
+        )
+
+
 def sync(args):
     all_files = []
     all_flat_files = []
@@ -115,6 +194,10 @@ def parse_args():
     ggmod rename <old name> <new name>
         - Rename mod
 
+    ggmod dupes
+        - Report stored mods with identical paks or
+          mostly shared assets
+
     ggmod sync
         - Synchronise mod changes across staging folderand
           and actual game dir
@@ -152,6 +235,18 @@ def parse_args():
     )
     sync_parser.set_defaults(func=sync)
 
+    dupes_parser = subparsers.add_parser(
+        "dupes", help="Report identical and near-identical stored mods"
+    )
+    dupes_parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="Fraction of shared assets to count as a near-duplicate",
+    )
+    dupes_parser.set_defaults(func=dupes)
+
     args = parser.parse_args()
 
     if not any(vars(args).values()):
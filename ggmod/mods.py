@@ -1,4 +1,7 @@
 from ggmod import util
+from ggmod.classify import CHARACTER_TYPES, ModClassification, classify_paths
+from ggmod.fingerprint import fingerprint_file
+from ggmod.preview import ArchivePreview, preview_archive
 from ggmod.const import GB_INFO_URL, CHAR_IDS
 from ggmod.settings import CACHE_DIR, MODS_DIR, DOWNLOAD_DIR, MODULE_DIR
 from ggmod.errors import SlotNotFoundError, CharNotFoundError
@@ -40,12 +43,15 @@ class Mod:
         slot: Optional[int] = None,
         char_id: Optional[str] = None,
         _staged: Optional[bool] = None,
+        mod_type: Optional[str] = None,
+        pak_hash: Optional[str] = None,
     ):
         """
         Create a new mod object with provided metadata and properties
 
         :param name: Shortened or colloquialised name of the mod
         :param info: Metadata stipped from gamebanana website
+        :param pak_hash: stored hash of the whole pak, hashed from the file if not given
         """
         self.name = name
         self.filename = info["_sFile"]
@@ -62,33 +68,65 @@ class Mod:
             self.staged = False
 
         self._pp = PP(open(pakfile, "rb"))
-        self._asset_paths = self._pp.List()
-        self._assets = [self._pp.Unpack(path) for path in self._asset_paths]
+        self._asset_paths = list(self._pp.List())
+        self._mount_point, self.fingerprints = util.read_pak_index(pakfile)
+        self._unpacked_assets = None
+        self._classification = None
+
+        self.pak_hash = pak_hash if pak_hash is not None else fingerprint_file(pakfile)
+        self.mod_type = mod_type
 
         self._char_id = char_id
         self._mesh = is_mesh
-        if not is_mesh:
-            self._slot = slot
-        else:
+        if is_mesh and slot is not None:
             raise ValueError("Cannot specify mod as mesh and colour slot mod")
+        else:
+            self._slot = slot
+
+    @property
+    def _assets(self):
+        """
+        Unpacked assets - decompressed on first use since most mods can be
+        classified from their asset paths alone
+        """
+        if self._unpacked_assets is None:
+            self._unpacked_assets = [self._pp.Unpack(path) for path in self._asset_paths]
+        return self._unpacked_assets
+
+    @property
+    def classification(self) -> ModClassification:
+        if self._classification is None:
+            self._classification = classify_paths(self._asset_paths, self._mount_point)
+        return self._classification
 
     def determine_props(self):
         """
         Hopefully a temporary method
         """
+        if self.mod_type is None:
+            self.mod_type = self.classification.mod_type
+
+        # "unknown" mods still get their asset contents searched below
+        if self.mod_type not in (*CHARACTER_TYPES, "unknown"):
+            logging.debug(f"Mod {self.name} is a {self.mod_type} mod, not a character")
+            if self._char_id is None:
+                self._char_id = self.classification.char_id
+            self._mesh = False
+            return
+
         self._char_id = (
             self.char_id if self.char_id is not None else self.determine_char_id()
         )
 
-        self._mesh = (
-            self.is_mesh if self.is_mesh is not None else self.determine_meshed_mod()
-        )
+        self._mesh = self.mesh if self.mesh is not None else self.determine_meshed_mod()
 
         if not self._mesh:
             self._slot = self.slot if self.slot is not None else self.determine_slot()
         else:
             self._slot = None
 
+        self.mod_type = "mesh" if self._mesh else "colour"
+
     @property
     def char_id(self):
         return self._char_id
@@ -132,15 +170,19 @@ class Mod:
 
         :returns: True if any of the directories for the assets contain the word "Mesh"
         """
-        return any(map(lambda path: "mesh" in path.lower(), self._asset_paths))
+        return self.classification.mesh
 
     def determine_char_id(self):
         """
         Rank popularity of character code sequences and choose the most popular,
-        assuming the most popular character code is the correct one
+        assuming the most popular character code is the correct one - asset paths
+        are tried first and asset contents only searched if they don't match
 
         :returns: three-letter character code
         """
+        if self.classification.char_id is not None:
+            return self.classification.char_id
+
         char_id_search = list(
             map(
                 lambda asset: re.search("Chara/([A-Z]{3})".encode(), asset.Data),
@@ -172,6 +214,9 @@ class Mod:
 
         :returns: either a string matching the slot code or False if the mod is mesh mod
         """
+        if self.classification.slot is not None:
+            return self.classification.slot
+
         slt_match_bytes = f"/Game/Chara/{self.char_id}/Costume[0-9]+/Material/Color([0-9]+)/{self.char_id}_base".encode()
         slot_search = [re.search(slt_match_bytes, asset.Data) for asset in self._assets]
         matches = []
@@ -247,19 +292,147 @@ class Mod:
 
         :returns: Dictionary of all arguments given to this class
         """
-        self_data = {}
-        self_data["name"] = self.name
-        self_data["info"] = {
-            "_sFile": self.filename,
-            "_sDescription": self.description,
-            "_tsDateAdded": self.ts_date_added,
-        }
-        self_data["pakfile"] = self.pakfile
-        self_data["sigfile"] = self.sigfile
-        self_data["mesh"] = self.mesh
-        self_data["slot"] = self.slot
-        self_data["char_id"] = self.char_id
-        self_data["staged"] = self.staged
+        return self.to_record()._convert_to_dict()
+
+    def to_record(self) -> "ModRecord":
+        """
+        Strip the mod down to its stored metadata
+
+        :returns: ModRecord holding the same metadata as this mod
+        """
+        return ModRecord(**{field: getattr(self, field) for field in ModRecord.__slots__})
+
+
+class ModRecord:
+    """
+    Lightweight stored metadata for a mod, as kept in mod_db.json
+
+    Unlike Mod, creating a record never opens the pak file, so listing and
+    filtering stored mods is cheap. Call to_mod() to get the full Mod when the
+    pak contents are actually needed.
+
+    __slots__ is the single list of stored fields - Mod exposes an attribute
+    of the same name for each one, and the gamebanana fields in INFO_KEYS are
+    nested under "info" in mod_db.json.
+    """
+
+    INFO_KEYS = {
+        "filename": "_sFile",
+        "description": "_sDescription",
+        "ts_date_added": "_tsDateAdded",
+    }
+
+    __slots__ = (
+        "name",
+        "filename",
+        "description",
+        "ts_date_added",
+        "pakfile",
+        "sigfile",
+        "mesh",
+        "slot",
+        "char_id",
+        "staged",
+        "mod_type",
+        "pak_hash",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        filename: str,
+        description: str,
+        ts_date_added: int,
+        pakfile: str,
+        sigfile: str,
+        mesh: Optional[bool] = None,
+        slot: Optional[str] = None,
+        char_id: Optional[str] = None,
+        staged: bool = False,
+        mod_type: Optional[str] = None,
+        pak_hash: Optional[str] = None,
+    ):
+        self.name = name
+        self.filename = filename
+        self.description = description
+        self.ts_date_added = ts_date_added
+        self.pakfile = pakfile
+        self.sigfile = sigfile
+        self.mesh = mesh
+        self.slot = slot
+        self.char_id = char_id
+        self.staged = staged
+        self.mod_type = mod_type
+        self.pak_hash = pak_hash
+
+    def __repr__(self) -> str:
+        return f"ModRecord({self.name!r}, char_id={self.char_id!r}, slot={self.slot!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ModRecord):
+            return NotImplemented
+        return self._convert_to_dict() == other._convert_to_dict()
+
+    def __hash__(self) -> int:
+        # equal records always share these, and they don't change once stored
+        return hash((self.name, self.pakfile))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ModRecord":
+        """
+        Create a record from a mod_db.json entry
+
+        :param data: dictionary in the form given by Mod._convert_to_dict
+        :returns: record of the stored mod
+        """
+        kwargs = {field: data[field] for field in cls.__slots__ if field in data}
+        for field, key in cls.INFO_KEYS.items():
+            kwargs[field] = data["info"][key]
+
+        return cls(**kwargs)
+
+    def to_mod(self) -> Mod:
+        """
+        Upgrade the record to a full Mod - this opens the pak and reads its
+        index, but reuses the stored pak hash and leaves assets unpacked until
+        they are needed
+
+        :returns: Mod with the same metadata as this record
+        """
+        mod = Mod(
+            self.name,
+            {
+                "_sFile": self.filename,
+                "_sDescription": self.description,
+                "_tsDateAdded": self.ts_date_added,
+            },
+            self.pakfile,
+            self.sigfile,
+            is_mesh=self.mesh,
+            slot=self.slot,
+            char_id=self.char_id,
+            _staged=self.staged,
+            mod_type=self.mod_type,
+            pak_hash=self.pak_hash,
+        )
+
+        if self.staged:
+            mod.stored_dir = os.path.join(MODS_DIR, self.name)
+
+        return mod
+
+    def _convert_to_dict(self) -> Dict:
+        """
+        Convert to the same dict form as Mod._convert_to_dict
+
+        :returns: Dictionary of all stored metadata
+        """
+        self_data = {"info": {}}
+        for field in self.__slots__:
+            if field in self.INFO_KEYS:
+                self_data["info"][self.INFO_KEYS[field]] = getattr(self, field)
+            else:
+                self_data[field] = getattr(self, field)
         return self_data
 
 
@@ -280,6 +453,18 @@ class ModLink:
         self._mesh = None
         self._slot = None
         self._char_id = None
+        self._preview = None
+
+    def preview(self) -> ArchivePreview:
+        """
+        List the archive contents without downloading the whole archive,
+        the result is cached on the link
+
+        :returns: preview of the files in the archive
+        """
+        if self._preview is None:
+            self._preview = preview_archive(self._download_url)
+        return self._preview
 
     def set_mesh(self, value: bool):
         self._mesh = value
@@ -370,10 +555,14 @@ class ModDB:
     Manage moddb.json stored mods - the stored JSON is a list of
     JSON objects that can be restored to fully functional Mod()
     python objects
+
+    Per-asset fingerprints are kept apart in fingerprints.json, keyed by
+    pak hash, so that listing mods never loads them
     """
 
     def __init__(self):
         self.path = os.path.join(CACHE_DIR, "mod_db.json")
+        self.fingerprints_path = os.path.join(CACHE_DIR, "fingerprints.json")
 
         if not os.path.exists(self.path):
             with open(self.path, "w") as fp:
@@ -382,12 +571,19 @@ class ModDB:
         self._file_ro = open(self.path, "r")
         self._db = json.load(self._file_ro)
 
-    def store_mod(self, mod: Mod) -> None:
+    def store_mod(self, mod: Mod, force: bool = False) -> None:
         """
         Stores a mod as an object in a JSON file
 
         :param mod: the mod to store in the file
+        :param force: store the mod even if an identical pak is already stored
         """
+        if not force:
+            duplicate = self.find_duplicate(mod)
+            if duplicate is not None:
+                logging.info(f"Mod {mod.name} is identical to stored mod {duplicate.name}")
+                return
+
         mod_data = mod._convert_to_dict()
         new_db = self._db.copy()
 
@@ -396,21 +592,73 @@ class ModDB:
 
             with open(self.path, "w") as fp:
                 json.dump(new_db, fp)
+
+            self._store_fingerprints(mod)
         else:
             return
 
-    def get_mods(self) -> List[Mod]:
+    def _store_fingerprints(self, mod: Mod) -> None:
+        if not mod.pak_hash or not mod.fingerprints:
+            return
+
+        fingerprints = self.get_fingerprints()
+        fingerprints[mod.pak_hash] = mod.fingerprints
+
+        with open(self.fingerprints_path, "w") as fp:
+            json.dump(fingerprints, fp)
+
+    def get_fingerprints(self) -> Dict[str, Dict[str, str]]:
+        """
+        Returns the per-asset fingerprints of every stored pak
+
+        :returns: asset path to fingerprint mappings, keyed by pak hash
+        """
+        if not os.path.exists(self.fingerprints_path):
+            return {}
+
+        with open(self.fingerprints_path) as fp:
+            return json.load(fp)
+
+    def find_duplicate(self, mod: Union[Mod, ModRecord]) -> Optional[ModRecord]:
+        """
+        Look for a stored mod with a byte-for-byte identical pak file
+
+        :param mod: the mod to look for
+        :returns: the stored duplicate, or None if there isn't one
+        """
+        if not mod.pak_hash:
+            return None
+
+        for data in self._db["mods"]:
+            if data.get("pak_hash") == mod.pak_hash:
+                return ModRecord.from_dict(data)
+
+        return None
+
+    def get_mods(self) -> List[ModRecord]:
         """
-        Returns all mods stored as objects in the JSON file
+        Returns metadata for all mods stored in the JSON file, without
+        opening any pak files
+
+        :returns: list of stored ModRecord objects
+        """
+        return [ModRecord.from_dict(data) for data in self._db["mods"]]
+
+    def get_full_mods(self) -> List[Mod]:
+        """
+        Returns all mods stored in the JSON file as full Mod objects - this
+        opens every pak file and reads its index, so use get_mods() where possible
 
         :returns: list of stored Mod objects
         """
-        mods = [Mod(**data) for data in self._db["mods"]]
-        return mods
+        return [record.to_mod() for record in self.get_mods()]
 
     def clear(self) -> None:
         """
-        Clears all mods in mod_db.json
+        Clears all mods in mod_db.json, along with their fingerprints
         """
         with open(self.path, "w") as fp:
-            json.dump([], fp)
+            json.dump({"mods": []}, fp)
+
+        if os.path.exists(self.fingerprints_path):
+            os.remove(self.fingerprints_path)
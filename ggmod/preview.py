@@ -0,0 +1,223 @@
+import logging
+import os
+import re
+import struct
+
+from typing import List, Optional, Tuple
+
+import requests
+
+from ggmod.const import CHAR_IDS
+
+PREVIEW_CAP = 1 << 20
+ZIP_TAIL_SIZE = (1 << 16) + 22
+REQUEST_TIMEOUT = 30
+
+EOCD_SIG = b"PK\x05\x06"
+EOCD_STRUCT = struct.Struct("<4s4H2LH")
+CDIR_SIG = b"PK\x01\x02"
+CDIR_STRUCT = struct.Struct("<4s6H3L5H2L")
+ZIP64_MARKER = 0xFFFFFFFF
+
+PAK_NAME_RE = re.compile(rb"[\w \-#'().,&+]+\.pak", re.IGNORECASE)
+SLOT_RE = re.compile(r"(?:colou?r|col|slot)[ _-]?([0-9]{1,2})", re.IGNORECASE)
+TRAILING_NUM_RE = re.compile(r"(?<![0-9])([0-9]{1,2})\.pak$", re.IGNORECASE)
+
+
+class ArchivePreview:
+    """
+    Contents of a remote archive, read without downloading all of it
+
+    Zip archives are listed exactly from their central directory. Anything
+    else is listed on a best-effort basis from the first part of the file, in
+    which case the listing is not complete and sizes are unknown.
+    """
+
+    def __init__(self, entries: List[Tuple[str, Optional[int]]], complete: bool):
+        """
+        :param entries: (file name, uncompressed size) of each archive member
+        :param complete: True if entries is known to list the whole archive
+        """
+        self.entries = entries
+        self.complete = complete
+
+    @property
+    def paks(self) -> List[Tuple[str, Optional[int]]]:
+        return [entry for entry in self.entries if entry[0].lower().endswith(".pak")]
+
+    @property
+    def has_paks(self) -> bool:
+        """
+        False only when the archive is known to contain no pak files
+        """
+        return bool(self.paks) or not self.complete
+
+
+def guess_char_slot(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Guess character and colour slot from a pak file name alone, e.g.
+    "GothColor03.pak" or "YUTA KY 02.pak"
+
+    :param name: pak file name
+    :returns: (three-letter character code, two-digit slot), either may be None
+    """
+    stem = os.path.basename(name)
+    char_id = None
+
+    for code, full_name in CHAR_IDS.items():
+        candidates = {code, full_name, full_name.split(" ")[0]}
+        for candidate in candidates:
+            pattern = rf"(?<![A-Za-z]){re.escape(candidate)}(?![A-Za-z])"
+            if re.search(pattern, stem, re.IGNORECASE):
+                char_id = code
+                break
+        if char_id is not None:
+            break
+
+    slot_match = SLOT_RE.search(stem) or TRAILING_NUM_RE.search(stem)
+    slot = f"{int(slot_match[1]):02d}" if slot_match else None
+
+    return char_id, slot
+
+
+def preview_archive(url: str) -> ArchivePreview:
+    """
+    List the files in a remote archive using HTTP Range requests, falling back
+    to a partial download capped at PREVIEW_CAP bytes
+
+    :param url: download URL of the archive
+    :returns: preview of the archive contents
+    """
+    tail, total, whole = _get_range(url, f"-{ZIP_TAIL_SIZE}")
+
+    if whole:
+        # the server ignored the range and the archive fit under the cap
+        total = len(tail)
+    elif total is None:
+        # a capped read from the start, or a tail of unknown offset
+        logging.debug(f"No usable range support for {url}, scanning partial read")
+        return _scan_names(tail)
+
+    entries = _list_zip(url, tail, total)
+    if entries is not None:
+        return ArchivePreview(entries, True)
+    elif whole:
+        return _scan_names(tail)
+
+    head, _, _ = _get_range(url, f"0-{PREVIEW_CAP - 1}")
+    return _scan_names(head)
+
+
+def _get_range(url: str, byte_range: str) -> Tuple[bytes, Optional[int], bool]:
+    """
+    :returns: requested bytes and total archive size, or None for the size if
+        it is unknown - and whether the bytes are known to be the whole archive,
+        which happens when the server ignored the Range header
+    """
+    response = requests.get(
+        url,
+        headers={"Range": f"bytes={byte_range}"},
+        stream=True,
+        timeout=REQUEST_TIMEOUT,
+    )
+
+    with response:
+        if response.status_code == 206:
+            content_range = response.headers.get("Content-Range", "")
+            total = content_range.rpartition("/")[2]
+            if total.isdigit():
+                return response.content, int(total), False
+            return _read_capped(response), None, False
+        elif response.status_code > 399:
+            logging.warning(f"<{response.status_code}> preview of {url} failed")
+            response.raise_for_status()
+
+        data = _read_capped(response)
+        return data, None, len(data) < PREVIEW_CAP
+
+
+def _read_capped(response: requests.Response) -> bytes:
+    data = b""
+    for chunk in response.iter_content(chunk_size=1 << 16):
+        data += chunk
+        if len(data) >= PREVIEW_CAP:
+            return data[:PREVIEW_CAP]
+    return data
+
+
+def _list_zip(url: str, tail: bytes, total: int) -> Optional[List]:
+    """
+    Read the zip central directory, fetching it separately if it does not fit
+    inside the tail already downloaded
+
+    :returns: archive entries, or None if this is not a (non-zip64) zip or its
+        central directory cannot be read in full
+    """
+    eocd_pos = tail.rfind(EOCD_SIG)
+    if eocd_pos == -1 or len(tail) - eocd_pos < EOCD_STRUCT.size:
+        return None
+
+    fields = EOCD_STRUCT.unpack_from(tail, eocd_pos)
+    entry_count, cdir_size, cdir_offset = fields[4:7]
+    if ZIP64_MARKER in (cdir_size, cdir_offset):
+        return None
+
+    # data prepended to the zip (e.g. self-extractors) shifts every offset
+    tail_start = total - len(tail)
+    prepended = tail_start + eocd_pos - cdir_size - cdir_offset
+    if prepended < 0:
+        return None
+    cdir_offset += prepended
+
+    if cdir_offset >= tail_start:
+        start = cdir_offset - tail_start
+        cdir = tail[start : start + cdir_size]
+    else:
+        cdir, cdir_total, _ = _get_range(
+            url, f"{cdir_offset}-{cdir_offset + cdir_size - 1}"
+        )
+        if cdir_total is None:
+            return None
+
+    if len(cdir) != cdir_size or not cdir.startswith(CDIR_SIG):
+        return None
+
+    entries = []
+    record_count = 0
+    pos = 0
+
+    while pos + CDIR_STRUCT.size <= len(cdir):
+        fields = CDIR_STRUCT.unpack_from(cdir, pos)
+        if fields[0] != CDIR_SIG:
+            break
+        record_count += 1
+
+        flags, size = fields[3], fields[9]
+        name_len, extra_len, comment_len = fields[10:13]
+
+        raw_name = cdir[pos + CDIR_STRUCT.size : pos + CDIR_STRUCT.size + name_len]
+        encoding = "utf-8" if flags & 0x800 else "cp437"
+        name = raw_name.decode(encoding, errors="replace")
+        if not name.endswith("/"):
+            entries.append((name, size))
+
+        pos += CDIR_STRUCT.size + name_len + extra_len + comment_len
+
+    if record_count != entry_count:
+        return None
+
+    return entries
+
+
+def _scan_names(data: bytes) -> ArchivePreview:
+    """
+    Pick pak names out of archive headers (e.g. rar) that store file names
+    uncompressed - this can miss files so the preview is never complete
+    """
+    names = []
+    for match in PAK_NAME_RE.finditer(data):
+        name = match[0].decode("utf-8", errors="replace").strip()
+        if name not in names:
+            names.append(name)
+
+    return ArchivePreview([(name, None) for name in names], False)
@@ -1,10 +1,16 @@
 import logging
 import os
+import struct
 
-from typing import List
+from typing import Dict, List, Tuple
 
 import requests
 
+PAK_MAGIC = 0x5A6F12E1
+PAK_FOOTER_OFFSETS = (44, 172, 204, 205)
+# v10 and later use a path hash index with a different layout
+PAK_MAX_VERSION = 9
+
 
 def decompress_into_dir(path: str, dirname: str) -> List[str]:
     """
@@ -37,6 +43,109 @@ def decompress_into_dir(path: str, dirname: str) -> List[str]:
     return [os.path.join(new_dir, file) for file in files]
 
 
+def read_pak_index(path: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Read the mount point and the SHA1 of every entry from the index of a UE4
+    pak file, without reading or decompressing any of its assets
+
+    Offsets and lengths in the index are checked against the index bounds, so
+    an encrypted or corrupt index gives empty results rather than huge reads
+
+    :param path: path to the pak file
+    :returns: mount point, e.g. ../../../RED/Content/Chara/ELP/Costume01/, and
+        a hex SHA1 for each entry name - both empty if the index is unreadable
+    """
+    try:
+        with open(path, "rb") as fp:
+            return _read_pak_index(fp, os.path.getsize(path))
+    except (ValueError, struct.error, UnicodeDecodeError) as e:
+        logging.warning(f"Could not read pak index of {path}: {e}")
+        return "", {}
+
+
+def _read_pak_index(fp, file_size: int) -> Tuple[str, Dict[str, str]]:
+    # the footer grows with the version, but always starts at the magic:
+    # 44 bytes up to v7, 172/204 with v8 compression names, 205 with the v9
+    # frozen index flag
+    for footer_offset in PAK_FOOTER_OFFSETS:
+        if file_size < footer_offset:
+            continue
+        fp.seek(-footer_offset, os.SEEK_END)
+        magic, version, index_offset, index_size = struct.unpack("<IIQQ", fp.read(24))
+        if magic == PAK_MAGIC:
+            break
+    else:
+        raise ValueError("no pak footer found")
+
+    if version > PAK_MAX_VERSION:
+        raise ValueError(f"unsupported pak version {version}")
+
+    if version >= 4 and file_size > footer_offset:
+        fp.seek(-footer_offset - 1, os.SEEK_END)
+        if fp.read(1) != b"\x00":
+            raise ValueError("pak index is encrypted")
+
+    if version == 9:
+        fp.seek(-footer_offset + 44, os.SEEK_END)
+        if fp.read(1) != b"\x00":
+            raise ValueError("frozen pak indexes are unsupported")
+
+    if index_offset + index_size > file_size:
+        raise ValueError("index lies outside the file")
+
+    fp.seek(index_offset)
+    index = PakIndexReader(fp.read(index_size))
+
+    mount_point = index.read_string()
+    hashes = {}
+
+    for _ in range(index.read("<I")):
+        name = index.read_string()
+        _, _, _, compression = index.read("<QQQI")
+        if version <= 1:
+            index.read("<Q")
+        hashes[name] = index.read_bytes(20).hex()
+
+        if version >= 3:
+            if compression != 0:
+                index.read_bytes(index.read("<I") * 16)
+            index.read("<BI")
+
+    return mount_point, hashes
+
+
+class PakIndexReader:
+    """
+    Bounds-checked reads from an in-memory pak index
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def read_bytes(self, length: int) -> bytes:
+        if length < 0 or self.pos + length > len(self.data):
+            raise ValueError("read past the end of the pak index")
+        chunk = self.data[self.pos : self.pos + length]
+        self.pos += length
+        return chunk
+
+    def read(self, fmt: str):
+        values = struct.unpack(fmt, self.read_bytes(struct.calcsize(fmt)))
+        return values[0] if len(values) == 1 else values
+
+    def read_string(self) -> str:
+        length = self.read("<i")
+
+        # negative lengths are UTF-16 strings
+        if length < 0:
+            raw = self.read_bytes(-length * 2).decode("utf-16-le")
+        else:
+            raw = self.read_bytes(length).decode("utf-8")
+
+        return raw.rstrip("\x00")
+
+
 def create_dir(directory):
     """
     Create a new directory if it does not already exist
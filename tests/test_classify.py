@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from ggmod.classify import PatternAutomaton, classify_paths
+from ggmod.util import read_pak_index
+
+PAK = os.path.join(os.path.dirname(__file__), "GothColor03.pak")
+
+
+def test_fixture_pak():
+    mount_point, hashes = read_pak_index(PAK)
+    result = classify_paths(hashes.keys(), mount_point)
+
+    assert result.mod_type == "colour"
+    assert result.char_id == "ELP"
+    assert result.costume == "01"
+    assert result.slot == "03"
+    assert not result.mesh
+
+
+def test_bare_file_names():
+    # no mount point - only the asset name prefix gives the character away
+    result = classify_paths(["ELP_base.uasset", "ELP_base.uexp"])
+
+    assert result.mod_type == "character"
+    assert result.char_id == "ELP"
+    assert result.slot is None
+
+
+@pytest.mark.parametrize(
+    "paths, mount_point, mod_type, char_id",
+    [
+        (["VO_SOL_001.uasset"], "../../../RED/Content/Sound/Voice/SOL/", "voice", "SOL"),
+        (["T_SOL_Face.uasset"], "../../../RED/Content/UI/Chara/SOL/", "ui", "SOL"),
+        (["T_Title.uasset", "T_Title.uexp"], "../../../RED/Content/UI/Title/", "ui", None),
+        (["BG_Tex.uasset"], "../../../RED/Content/BG/Stage01/", "stage", None),
+        (["BGM_01.uasset"], "../../../RED/Content/Sound/BGM/", "music", None),
+        (["SOL_Body.uasset"], "../../../RED/Content/Chara/SOL/Costume02/Mesh/", "mesh", "SOL"),
+        (["readme.txt"], "", "unknown", None),
+    ],
+)
+def test_mod_types(paths, mount_point, mod_type, char_id):
+    result = classify_paths(paths, mount_point)
+
+    assert result.mod_type == mod_type
+    assert result.char_id == char_id
+
+
+def test_mesh_costume():
+    result = classify_paths(["SOL_Body.uasset"], "../../../RED/Content/Chara/SOL/Costume02/Mesh/")
+
+    assert result.mesh
+    assert result.costume == "02"
+
+
+def test_stray_asset_does_not_override_character():
+    paths = [f"Chara/ELP/Costume01/Material/Color05/ELP_{i}.uasset" for i in range(5)]
+    result = classify_paths(paths + ["UI/T_Icon.uasset"])
+
+    assert result.mod_type == "colour"
+    assert result.slot == "05"
+
+
+def test_automaton_overlapping_patterns():
+    automaton = PatternAutomaton({"he": ("he",), "she": ("she",), "hers": ("hers",)})
+
+    matches = sorted(automaton.matches("ushers"))
+
+    assert matches == [(4, ("he",)), (4, ("she",)), (6, ("hers",))]
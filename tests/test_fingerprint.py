@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from ggmod.fingerprint import find_identical, find_similar
+
+
+def record(name, pak_hash):
+    return SimpleNamespace(name=name, pak_hash=pak_hash)
+
+
+def test_find_identical():
+    records = [
+        record("a", "x"),
+        record("b", "y"),
+        record("a-reupload", "x"),
+        record("unhashed", None),
+        record("unhashed-too", None),
+    ]
+
+    groups = find_identical(records)
+
+    assert [[r.name for r in group] for group in groups] == [["a", "a-reupload"]]
+
+
+def test_find_similar():
+    fingerprints = {
+        "base": ["mesh", "tex1", "tex2", "tex3"],
+        "recolour": ["mesh", "tex1", "tex2", "other"],
+        "unrelated": ["foo", "bar"],
+        "empty": [],
+    }
+
+    pairs = find_similar(fingerprints, threshold=0.5)
+
+    assert pairs == [("base", "recolour", 3 / 5)]
+    assert find_similar(fingerprints, threshold=0.7) == []
+
+
+def test_find_similar_sorted_by_similarity():
+    fingerprints = {
+        "a": ["1", "2", "3", "4"],
+        "b": ["1", "2", "3", "4"],
+        "c": ["1", "2", "3", "5"],
+    }
+
+    pairs = find_similar(fingerprints, threshold=0.5)
+
+    assert pairs[0] == ("a", "b", 1.0)
+    assert {pair[:2] for pair in pairs[1:]} == {("a", "c"), ("b", "c")}
+
+
+def test_find_similar_skips_common_assets():
+    # every recolour keeps the same base mesh and changes one texture
+    fingerprints = {f"recolour{i}": ["mesh", f"tex{i}"] for i in range(10)}
+    fingerprints["reupload"] = ["mesh", "tex0"]
+
+    pairs = find_similar(fingerprints, threshold=0.3, max_owners=5)
+
+    # the mesh is in 11 paks so only the shared texture counts
+    assert pairs == [("recolour0", "reupload", 1 / 3)]
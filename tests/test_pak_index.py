@@ -0,0 +1,91 @@
+import os
+import struct
+
+import pytest
+
+from ggmod.util import read_pak_index
+
+PAK = os.path.join(os.path.dirname(__file__), "GothColor03.pak")
+MOUNT_POINT = "../../../RED/Content/Chara/ELP/Costume01/Material/Color03/"
+
+
+@pytest.fixture
+def pak_bytes():
+    with open(PAK, "rb") as fp:
+        return fp.read()
+
+
+def write_variant(tmp_path, pak_bytes, version, extra=b""):
+    """
+    Rewrite the v4 footer as a later version, followed by that version's
+    extra footer bytes
+    """
+    footer = bytearray(pak_bytes[-44:])
+    struct.pack_into("<I", footer, 4, version)
+    path = tmp_path / f"v{version}.pak"
+    path.write_bytes(pak_bytes[:-44] + bytes(footer) + extra)
+    return str(path)
+
+
+def test_v4_pak():
+    mount_point, hashes = read_pak_index(PAK)
+
+    assert mount_point == MOUNT_POINT
+    assert len(hashes) == 6
+    assert hashes["ELP_base.uasset"] == "0cec5f3660b72222009890b559aeee32be25fbc9"
+
+
+@pytest.mark.parametrize(
+    "version, extra",
+    [
+        (8, b"\0" * 32 * 4),  # v8a, 172 byte footer
+        (8, b"\0" * 32 * 5),  # v8b, 204 byte footer
+        (9, b"\0" + b"\0" * 32 * 5),  # v9, 205 byte footer, index not frozen
+    ],
+)
+def test_later_footers(tmp_path, pak_bytes, version, extra):
+    mount_point, hashes = read_pak_index(write_variant(tmp_path, pak_bytes, version, extra))
+
+    assert mount_point == MOUNT_POINT
+    assert len(hashes) == 6
+
+
+@pytest.mark.parametrize(
+    "version, extra",
+    [
+        (9, b"\1" + b"\0" * 32 * 5),  # frozen index
+        (11, b"\0" * 32 * 5),  # path hash index
+    ],
+)
+def test_unsupported_versions(tmp_path, pak_bytes, version, extra, caplog):
+    assert read_pak_index(write_variant(tmp_path, pak_bytes, version, extra)) == ("", {})
+    assert "pak" in caplog.text
+
+
+def test_encrypted_index(tmp_path, pak_bytes):
+    path = tmp_path / "encrypted.pak"
+    path.write_bytes(pak_bytes[:-45] + b"\1" + pak_bytes[-44:])
+
+    assert read_pak_index(str(path)) == ("", {})
+
+
+def test_truncated_pak(tmp_path, pak_bytes):
+    short = tmp_path / "short.pak"
+    short.write_bytes(pak_bytes[:10])
+
+    # footer intact but the index it points at is cut off
+    cut = tmp_path / "cut.pak"
+    cut.write_bytes(pak_bytes[:100] + pak_bytes[-44:])
+
+    assert read_pak_index(str(short)) == ("", {})
+    assert read_pak_index(str(cut)) == ("", {})
+
+
+def test_huge_string_length(tmp_path, pak_bytes):
+    (index_offset,) = struct.unpack_from("<Q", pak_bytes, len(pak_bytes) - 44 + 8)
+    corrupt = bytearray(pak_bytes)
+    struct.pack_into("<i", corrupt, index_offset, 2**31 - 1)
+    path = tmp_path / "corrupt.pak"
+    path.write_bytes(bytes(corrupt))
+
+    assert read_pak_index(str(path)) == ("", {})
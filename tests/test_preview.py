@@ -0,0 +1,109 @@
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "bench"))
+
+from gbstub import StubServer, StubSite  # noqa: E402
+from ggmod.preview import preview_archive  # noqa: E402
+
+
+@pytest.fixture
+def records_dir(tmp_path):
+    with zipfile.ZipFile(tmp_path / "nopak.zip", "w") as zf:
+        zf.writestr("readme.txt", "no paks here")
+
+    # central directory too big to fit in the first Range read
+    with zipfile.ZipFile(tmp_path / "many.zip", "w") as zf:
+        zf.writestr("mod/GothColor03.pak", b"\0" * 100)
+        for i in range(3000):
+            zf.writestr(f"extras/some/long/directory/file_{i:05d}.txt", b"x")
+
+    with zipfile.ZipFile(tmp_path / "badname.zip", "w") as zf:
+        zf.writestr("placeholder.pak", b"\0")
+
+    # flag the name as UTF-8 in the central directory, then make it invalid
+    raw = bytearray((tmp_path / "badname.zip").read_bytes())
+    flags_pos = raw.index(b"PK\x01\x02") + 8
+    raw[flags_pos + 1] |= 0x08
+    raw = raw.replace(b"placeholder", b"\xffplacehold\xfe")
+    (tmp_path / "badname.zip").write_bytes(raw)
+
+    # e.g. a self-extracting archive - offsets are relative to the zip data
+    with zipfile.ZipFile(tmp_path / "prepended.zip", "w") as zf:
+        zf.writestr("GothColor03.pak", b"\0" * 100)
+    raw = (tmp_path / "prepended.zip").read_bytes()
+    (tmp_path / "prepended.zip").write_bytes(b"\x90" * 200 + raw)
+
+    with zipfile.ZipFile(tmp_path / "corrupt.zip", "w") as zf:
+        zf.writestr("GothColor03.pak", b"\0" * 100)
+    raw = (tmp_path / "corrupt.zip").read_bytes()
+    (tmp_path / "corrupt.zip").write_bytes(raw.replace(b"PK\x01\x02", b"XX\x01\x02"))
+
+    return str(tmp_path)
+
+
+@pytest.fixture(params=[True, False], ids=["ranges", "no-ranges"])
+def server(request, records_dir):
+    stub = StubServer(StubSite(records_dir=records_dir), ranges=request.param)
+    stub.start()
+    yield stub
+    stub.shutdown()
+
+
+def test_generated_archive(server):
+    preview = preview_archive(f"{server.base_url}/dl/stub_1.zip")
+
+    assert preview.has_paks
+    assert [name for name, _ in preview.paks] == ["stub_1.pak"]
+
+    if server.ranges:
+        assert preview.complete
+        assert [name for name, _ in preview.entries] == ["stub_1.pak", "stub_1.sig"]
+        assert all(size is not None for _, size in preview.entries)
+    else:
+        # too big for the capped read, so only scanned names are known
+        assert not preview.complete
+        assert preview.paks == [("stub_1.pak", None)]
+
+
+def test_archive_without_paks(server):
+    preview = preview_archive(f"{server.base_url}/dl/nopak.zip")
+
+    assert preview.complete
+    assert preview.entries == [("readme.txt", 12)]
+    assert not preview.has_paks
+
+
+def test_central_directory_outside_tail(server):
+    preview = preview_archive(f"{server.base_url}/dl/many.zip")
+
+    assert preview.complete
+    assert len(preview.entries) == 3001
+    assert preview.paks == [("mod/GothColor03.pak", 100)]
+
+
+def test_invalid_utf8_name(server):
+    preview = preview_archive(f"{server.base_url}/dl/badname.zip")
+
+    assert preview.complete
+    assert preview.has_paks
+    assert len(preview.paks) == 1
+
+
+def test_prepended_data(server):
+    preview = preview_archive(f"{server.base_url}/dl/prepended.zip")
+
+    assert preview.complete
+    assert preview.paks == [("GothColor03.pak", 100)]
+
+
+def test_unreadable_central_directory_is_incomplete(server):
+    preview = preview_archive(f"{server.base_url}/dl/corrupt.zip")
+
+    # never claim a complete listing without paks from a listing that failed
+    assert not preview.complete
+    assert preview.has_paks
+    assert preview.paks == [("GothColor03.pak", None)]